@@ -0,0 +1,84 @@
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    import redis
+    HAS_REDIS = True
+except Exception:  # pragma: no cover - optional dependency
+    redis = None
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "60"))
+
+# Short timeouts: a slow or missing Redis must never hold up a request.
+_client = (
+    redis.Redis.from_url(REDIS_URL, socket_timeout=0.25, socket_connect_timeout=0.25)
+    if HAS_REDIS and REDIS_URL
+    else None
+)
+
+# Process-local (expires_at, value) entries for the few fixed keys that opt in with
+# local_fallback; only used when Redis is not configured.
+_local: Dict[str, Tuple[float, bytes]] = {}
+
+
+def cache_get(key: str, local_fallback: bool = False) -> Optional[bytes]:
+    """Return the cached bytes for key, or None on a miss or when Redis is unavailable."""
+    if _client is None:
+        if local_fallback:
+            entry = _local.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        return None
+    try:
+        return _client.get(key)
+    except redis.RedisError as exc:
+        logger.warning(f"Cache read failed for {key}: {exc}")
+        return None
+
+
+def cache_set(key: str, value: bytes, ttl: int = DASHBOARD_CACHE_TTL, local_fallback: bool = False) -> None:
+    """Store value under key for ttl seconds; failures are logged and ignored."""
+    if _client is None:
+        if local_fallback:
+            _local[key] = (time.monotonic() + ttl, value)
+        return
+    try:
+        _client.setex(key, ttl, value)
+    except redis.RedisError as exc:
+        logger.warning(f"Cache write failed for {key}: {exc}")
+
+
+def cache_delete(key: str) -> None:
+    """Drop a single key; failures are logged and ignored."""
+    _local.pop(key, None)
+    if _client is None:
+        return
+    try:
+        _client.delete(key)
+    except redis.RedisError as exc:
+        logger.warning(f"Cache invalidation failed for {key}: {exc}")
+
+
+def cache_delete_prefix(prefix: str) -> None:
+    """Drop every key starting with prefix; failures are logged and ignored."""
+    if _client is None:
+        return
+    try:
+        keys = list(_client.scan_iter(match=f"{prefix}*", count=500))
+        if keys:
+            _client.delete(*keys)
+    except redis.RedisError as exc:
+        logger.warning(f"Cache invalidation failed for {prefix}: {exc}")
+
+
+def dashboard_cache_prefix(company_id: int) -> str:
+    return f"dash:{company_id}:"
+
+# Average of the most recent quality scores; shared by every company's upload config.
+RECENT_QUALITY_KEY = "quality:recent_avg"
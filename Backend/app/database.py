@@ -5,14 +5,20 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 
 DEFAULT_SQLITE_PATH = Path(__file__).resolve().parents[1] / "data.db"
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DEFAULT_SQLITE_PATH.as_posix()}")
+# Rows per multi-VALUES INSERT when the ORM or Core batches inserts
+INSERT_PAGE_SIZE = int(os.getenv("DB_INSERT_PAGE_SIZE", "10000"))
 
 # Determine if we're using SQLite or PostgreSQL
 if DATABASE_URL.startswith("sqlite"):
     # SQLite requires check_same_thread=False
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        insertmanyvalues_page_size=INSERT_PAGE_SIZE,
+    )
 else:
     # PostgreSQL and other databases don't need this argument
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, insertmanyvalues_page_size=INSERT_PAGE_SIZE)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
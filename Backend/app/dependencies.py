@@ -1,19 +1,22 @@
 import os
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from passlib.context import CryptContext
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
-from app.models import User
+from app.models import Company, Sector, User
 
 # Security settings
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Built once: passing a string key makes jose re-parse and re-construct the HMAC key on every call.
+SIGNING_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 security = HTTPBearer()
@@ -25,6 +28,44 @@ def get_db():
     finally:
         db.close()
 
+def request_cache(db: Session, name: str) -> Dict[Any, Any]:
+    """Per-request memo stored on the session, which get_db opens once per request."""
+    # Handlers check access through several helpers (the raw-data lookup, then the
+    # listing or compare query); this keeps those to one sector and one user query.
+    return db.info.setdefault(name, {})
+
+def get_allowed_sector_ids(db: Session, current_user: User) -> List[int]:
+    """Sector ids the user may see: the whole company, or only their own sector for sector heads."""
+    cache = request_cache(db, "allowed_sector_ids")
+    key = (current_user.id, current_user.company_id, current_user.role, current_user.sector_id)
+    if key not in cache:
+        query = db.query(Sector.id).filter(Sector.company_id == current_user.company_id)
+        if current_user.role == "sector_head":
+            query = query.filter(Sector.id == current_user.sector_id)
+        cache[key] = [row[0] for row in query.all()]
+    return list(cache[key])
+
+def get_allowed_uploader_ids(db: Session, current_user: User) -> List[int]:
+    """Ids of same-company users with the same role, whose uploads the user may see."""
+    cache = request_cache(db, "allowed_uploader_ids")
+    key = (current_user.company_id, current_user.role)
+    if key not in cache:
+        cache[key] = [
+            row[0]
+            for row in db.query(User.id).filter(
+                User.company_id == current_user.company_id,
+                User.role == current_user.role,
+            ).all()
+        ]
+    return list(cache[key])
+
+def bump_data_version(db: Session, company_id: int) -> None:
+    """Advance the company's data version inside the caller's transaction; call before commit."""
+    db.query(Company).filter(Company.id == company_id).update(
+        {Company.data_version: func.coalesce(Company.data_version, 0) + 1},
+        synchronize_session=False,
+    )
+
 def verify_password(plain_password, hashed_password):
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -41,7 +82,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def authenticate_user(db: Session, username: str, password: str):
@@ -61,7 +102,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(credentials.credentials, SIGNING_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -82,6 +123,9 @@ def check_role_permission(current_user: User, required_roles: list):
         )
     return True
 
+# Roles that see and manage company-wide data rather than a single sector
+COMPANY_LEADER_ROLES = frozenset({"ceo", "admin"})
+
 # Role-based access control decorators
 def require_role(roles: list):
     """Decorator to require specific roles"""
@@ -98,7 +142,7 @@ def require_sector_head(current_user: User = Depends(get_current_user)):
     return current_user
 
 def require_ceo(current_user: User = Depends(get_current_user)):
-    check_role_permission(current_user, ['ceo', 'admin'])
+    check_role_permission(current_user, COMPANY_LEADER_ROLES)
     return current_user
 
 def require_admin(current_user: User = Depends(get_current_user)):
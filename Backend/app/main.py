@@ -4,6 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 import logging
+from sqlalchemy import inspect, text
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +16,33 @@ from app.routers import dashboard, auth
 from app.routers import upload, analysis, ai, reports
 
 Base.metadata.create_all(bind=engine)
+
+
+def _add_missing_columns():
+    """Add nullable columns introduced after a table was first created."""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            logger.info(f"Added column {table.name}.{column.name}")
+
+
+def _add_missing_indexes():
+    """Create indexes declared after their table already existed."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+_add_missing_columns()
+_add_missing_indexes()
 app = FastAPI(title="SDAS - Smart Data Analytics System")
 
 # Get allowed origins from environment or use default
@@ -28,6 +56,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Largest request body accepted, checked against Content-Length before the body is read
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        return JSONResponse(status_code=413, content={"detail": "Upload too large"})
+    return await call_next(request)
+
+
 # Add request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -1,6 +1,6 @@
 
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Float, ForeignKey, Index, DDL
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Float, ForeignKey, Index, DDL, LargeBinary
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from app.database import Base
 
@@ -11,6 +11,8 @@ class Company(Base):
     name = Column(String(255), nullable=False)
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped by every write the leader dashboards read; their ETag is built from it
+    data_version = Column(Integer, nullable=True, default=0)
 
     sectors = relationship("Sector", back_populates="company")
     users = relationship("User", back_populates="company")
@@ -79,8 +81,13 @@ class RawData(Base):
     sector_id = Column(Integer, ForeignKey("sectors.id"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=True)
     data = Column(JSON, nullable=False)  # Raw data as JSON
+    data_arrow = deferred(Column(LargeBinary, nullable=True))  # Typed Arrow IPC snapshot of `data`
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     uploaded_by = Column(Integer, ForeignKey("users_roles.id"), nullable=False)
+    # Shape of `data`, so listings don't have to load the blob
+    row_count = Column(Integer, nullable=True)
+    column_count = Column(Integer, nullable=True)
+    column_names = Column(JSON, nullable=True)
 
     sector = relationship("Sector", back_populates="raw_data")
     cleaned_data = relationship("CleanedData", back_populates="raw_data")
@@ -94,6 +101,10 @@ class CleanedData(Base):
     cleaning_algorithm = Column(String(255), nullable=False)
     quality_score = Column(Float, nullable=False)
     cleaned_at = Column(DateTime, default=datetime.utcnow)
+    # Shape of `cleaned_data`, so listings don't have to load the blob
+    row_count = Column(Integer, nullable=True)
+    column_count = Column(Integer, nullable=True)
+    column_names = Column(JSON, nullable=True)
 
     raw_data = relationship("RawData", back_populates="cleaned_data")
     quality_scores = relationship("DataQualityScore", back_populates="cleaned_data")
@@ -190,8 +201,24 @@ CREATE TABLE IF NOT EXISTS raw_data_y2024 PARTITION OF raw_data
 """)
 
 # Indexes for performance
+# Resolves the same-company, same-role uploader subquery the dashboards scope by
+Index('idx_user_company_role', User.company_id, User.role)
 Index('idx_sector_time', RawData.sector_id, RawData.uploaded_at)
+# Matches the sector_id IN (...) AND uploaded_by IN (...) scope every dashboard aggregate applies
+Index('idx_sector_uploader', RawData.sector_id, RawData.uploaded_by)
 Index('idx_cleaned_raw', CleanedData.raw_data_id)
+# Covers the cleaning-stats count/avg so it never touches the cleaned_data blobs
+Index('idx_cleaned_raw_quality', CleanedData.raw_data_id, CleanedData.quality_score)
 Index('idx_prediction_sector', AIPrediction.sector_id)
+# Covers the CEO prediction_summary rollup (per-type count/avg within the company's sectors)
+Index('idx_prediction_sector_type', AIPrediction.sector_id, AIPrediction.prediction_type, AIPrediction.confidence)
 Index('idx_feedback_user', FeedbackLog.user_id)
+# Company sector lookups, the CEO product count and the recommendations join
+Index('idx_sector_company', Sector.company_id)
+Index('idx_product_sector', Product.sector_id)
+Index('idx_recommendation_prediction', AIRecommendation.prediction_id)
+# Serves the newest-first announcements feed and its created_at keyset cursor
+Index('idx_announcement_company_time', CompanyAnnouncement.company_id, CompanyAnnouncement.created_at)
 Index('idx_quality_cleaned', DataQualityScore.cleaned_data_id)
+# Lets the CEO sector_comparison average scores without reading data_quality_scores rows
+Index('idx_quality_cleaned_score', DataQualityScore.cleaned_data_id, DataQualityScore.score)
@@ -2,10 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from pydantic import BaseModel
-from app.database import SessionLocal
 from app.models import AIPrediction, AIRecommendation, Sector, RawData, CleanedData, User
 from app.services.ai_predictions import AIPredictionEngine
-from app.dependencies import get_current_user, require_sector_head, require_ceo
+from app.cache import cache_delete_prefix, dashboard_cache_prefix
+from app.dependencies import COMPANY_LEADER_ROLES, bump_data_version, get_current_user, get_db, require_sector_head, require_ceo, get_allowed_sector_ids, get_allowed_uploader_ids
 
 router = APIRouter()
 
@@ -26,33 +26,9 @@ class RolePredictionResponse(BaseModel):
     company_id: int
     predictions: List[dict]
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def _allowed_sector_ids(db: Session, current_user: User) -> List[int]:
-    query = db.query(Sector.id).filter(Sector.company_id == current_user.company_id)
-    if current_user.role == "sector_head":
-        query = query.filter(Sector.id == current_user.sector_id)
-    return [row[0] for row in query.all()]
-
-
-def _allowed_uploader_ids(db: Session, current_user: User) -> List[int]:
-    return [
-        row[0]
-        for row in db.query(User.id).filter(
-            User.company_id == current_user.company_id,
-            User.role == current_user.role,
-        ).all()
-    ]
-
 
 def _ensure_sector_access(db: Session, current_user: User, sector_id: int) -> None:
-    if sector_id not in _allowed_sector_ids(db, current_user):
+    if sector_id not in get_allowed_sector_ids(db, current_user):
         raise HTTPException(status_code=403, detail="Access denied")
 
 
@@ -62,8 +38,8 @@ async def get_role_predictions(
     current_user: User = Depends(get_current_user)
 ):
     """Return role-specific prediction guidance based on datasets used in the system."""
-    sector_ids = _allowed_sector_ids(db, current_user)
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    sector_ids = get_allowed_sector_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
     if not sector_ids or not uploader_ids:
         return {"role": current_user.role, "company_id": current_user.company_id, "predictions": []}
 
@@ -85,7 +61,7 @@ async def get_role_predictions(
     role_key = (current_user.role or "").lower()
     predictions = []
 
-    if role_key in ["ceo", "admin"]:
+    if role_key in COMPANY_LEADER_ROLES:
         predictions.append({
             "title": "Company Data Readiness",
             "value": round(cleaned_ratio, 2),
@@ -181,8 +157,8 @@ async def chat_assistant(
             ],
         }
 
-    sector_ids = _allowed_sector_ids(db, current_user)
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    sector_ids = get_allowed_sector_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
     if not sector_ids or not uploader_ids:
         sector_ids = [-1]
         uploader_ids = [-1]
@@ -208,7 +184,7 @@ async def chat_assistant(
         )\
         .order_by(CleanedData.cleaned_at.desc()).first()
     latest_quality = round((latest_cleaned.quality_score * 100), 2) if latest_cleaned else 0
-    role_scope = "company-wide" if role_key in ["ceo", "admin"] else "role-limited"
+    role_scope = "company-wide" if role_key in COMPANY_LEADER_ROLES else "role-limited"
 
     # Lightweight "training by data": gather recent schema context from accessible datasets.
     recent_raw = db.query(RawData).filter(
@@ -221,7 +197,7 @@ async def chat_assistant(
             schema_cols.update(item.data[0].keys())
     schema_preview = ", ".join(sorted(list(schema_cols))[:8]) if schema_cols else "no columns detected"
 
-    if any(keyword in text for keyword in ["all company", "all sectors", "all data"]) and role_key not in ["ceo", "admin"]:
+    if any(keyword in text for keyword in ["all company", "all sectors", "all data"]) and role_key not in COMPANY_LEADER_ROLES:
         return {
             "reply": (
                 "You can access only your authorized role scope. "
@@ -328,7 +304,7 @@ async def predict_sales(
     """Generate sales/demand forecasting predictions"""
 
     _ensure_sector_access(db, current_user, sector_id)
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
     if not uploader_ids:
         raise HTTPException(status_code=404, detail="No cleaned data available for prediction")
 
@@ -363,7 +339,9 @@ async def predict_sales(
         confidence=result.get('confidence', 0.5)
     )
     db.add(prediction_entry)
+    bump_data_version(db, current_user.company_id)
     db.commit()
+    cache_delete_prefix(dashboard_cache_prefix(current_user.company_id))
     db.refresh(prediction_entry)
 
     return {
@@ -384,7 +362,7 @@ async def detect_anomalies(
     """Detect trends and anomalies in data"""
 
     _ensure_sector_access(db, current_user, sector_id)
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
     if not uploader_ids:
         raise HTTPException(status_code=404, detail="No cleaned data available")
 
@@ -415,7 +393,9 @@ async def detect_anomalies(
         confidence=result.get('confidence', 0.8)
     )
     db.add(prediction_entry)
+    bump_data_version(db, current_user.company_id)
     db.commit()
+    cache_delete_prefix(dashboard_cache_prefix(current_user.company_id))
 
     return result
 
@@ -430,7 +410,7 @@ async def predict_risk(
     """Predict risk using machine learning"""
 
     _ensure_sector_access(db, current_user, sector_id)
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
     if not uploader_ids:
         raise HTTPException(status_code=404, detail="No cleaned data available")
 
@@ -461,7 +441,9 @@ async def predict_risk(
         confidence=result.get('confidence', 0.5)
     )
     db.add(prediction_entry)
+    bump_data_version(db, current_user.company_id)
     db.commit()
+    cache_delete_prefix(dashboard_cache_prefix(current_user.company_id))
 
     return result
 
@@ -474,7 +456,7 @@ async def generate_recommendations(
     """Generate AI-powered recommendations based on recent predictions"""
 
     _ensure_sector_access(db, current_user, sector_id)
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
 
     # Get recent predictions for the sector
     recent_predictions = db.query(AIPrediction)\
@@ -510,7 +492,9 @@ async def generate_recommendations(
                 explanation=recommendations.get('explanations', [])[i] if i < len(recommendations.get('explanations', [])) else ""
             )
             db.add(rec_entry)
+        bump_data_version(db, current_user.company_id)
         db.commit()
+        cache_delete_prefix(dashboard_cache_prefix(current_user.company_id))
 
     return recommendations
 
@@ -523,7 +507,7 @@ async def rank_sectors(
     """Rank sectors based on performance metrics"""
 
     # Get all sectors and their data
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
     sectors = db.query(Sector).filter(Sector.company_id == current_user.company_id).all()
     sector_data = {}
 
@@ -561,7 +545,7 @@ async def process_nl_query(
 
     # Get available data based on user role
     available_data = {}
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
     if current_user.role == 'sector_head':
         sector_data = db.query(CleanedData)\
             .join(RawData)\
@@ -573,9 +557,9 @@ async def process_nl_query(
             .first()
         if sector_data:
             available_data['sector_data'] = sector_data.cleaned_data
-    elif current_user.role in ['ceo', 'admin']:
+    elif current_user.role in COMPANY_LEADER_ROLES:
         # Company-wide data summary
-        company_sector_ids = _allowed_sector_ids(db, current_user)
+        company_sector_ids = get_allowed_sector_ids(db, current_user)
         available_data['company_summary'] = {
             'total_sectors': db.query(Sector).filter(Sector.company_id == current_user.company_id).count(),
             'total_predictions': db.query(AIPrediction)
@@ -603,7 +587,7 @@ async def get_predictions(
     """Get prediction history for a sector"""
 
     _ensure_sector_access(db, current_user, sector_id)
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
 
     predictions = db.query(AIPrediction)\
         .join(RawData, RawData.sector_id == AIPrediction.sector_id)\
@@ -634,7 +618,7 @@ async def get_recommendations(
     """Get AI recommendations for a sector"""
 
     _ensure_sector_access(db, current_user, sector_id)
-    uploader_ids = _allowed_uploader_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
 
     recommendations = db.query(AIRecommendation)\
         .join(AIPrediction)\
@@ -1,15 +1,19 @@
 from datetime import timedelta
+import json
 import logging
-import re
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 
 from app.models import User, Company, Sector, CompanyJoinRequest
 from app.dependencies import (
+    COMPANY_LEADER_ROLES,
+    bump_data_version,
     authenticate_user,
     create_access_token,
     verify_password,
@@ -43,8 +47,7 @@ class UserResponse(BaseModel):
     company_id: int
     sector_id: int | None = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class RegisterRequest(BaseModel):
     username: str
@@ -93,25 +96,31 @@ CANONICAL_ROLE_MAP = {
     "sector head": "sector_head",
 }
 
-COMPANY_CODE_PATTERN = re.compile(r"^company_(\d+)$", re.IGNORECASE)
+COMPANY_CODE_PREFIX = "company_"
+
+REVIEW_ACTIONS = frozenset({"approve", "reject"})
+
+_ROLE_SEPARATORS = str.maketrans({"-": "_", " ": "_"})
 
 def _normalize_role(role: str) -> str:
-    normalized = (role or "").strip().lower().replace("-", "_")
-    normalized = normalized.replace(" ", "_")
-    return CANONICAL_ROLE_MAP.get(normalized, "")
+    return CANONICAL_ROLE_MAP.get((role or "").strip().lower().translate(_ROLE_SEPARATORS), "")
 
 
 def _parse_company_code(company_code: str) -> int:
     value = (company_code or "").strip()
-    match = COMPANY_CODE_PATTERN.match(value)
-    if not match:
+    prefix_len = len(COMPANY_CODE_PREFIX)
+    digits = value[prefix_len:]
+    # isdecimal() accepts exactly what int() parses, same as the old \d+ pattern.
+    if value[:prefix_len].lower() != COMPANY_CODE_PREFIX or not digits.isdecimal():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid company_id format. Use pattern like company_01"
         )
-    return int(match.group(1))
+    return int(digits)
 
-@router.post("/login", response_model=LoginResponse)
+# Login and /me build their payloads from trusted columns, so they skip response
+# validation and return JSONResponse directly; the models stay for the OpenAPI schema.
+@router.post("/login", responses={200: {"model": LoginResponse}})
 def login(request: LoginRequest, db: Session = Depends(get_db)):
 
     """Authenticate user and return JWT token"""
@@ -135,7 +144,7 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
         expires_delta=access_token_expires
     )
     
-    return {
+    return JSONResponse({
         "access_token": access_token,
         "token_type": "bearer",
         "user": {
@@ -145,20 +154,20 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
             "company_id": user.company_id,
             "sector_id": user.sector_id
         }
-    }
+    })
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", responses={200: {"model": UserResponse}})
 def get_me(current_user: User = Depends(get_current_user)):
     """Get current authenticated user"""
     frontend_role = ROLE_MAPPING.get(current_user.role, current_user.role)
     
-    return {
+    return JSONResponse({
         "id": current_user.id,
         "username": current_user.username,
         "role": frontend_role,
         "company_id": current_user.company_id,
         "sector_id": current_user.sector_id
-    }
+    })
 
 @router.post("/register", response_model=RegisterResponse)
 def register(request: RegisterRequest, db: Session = Depends(get_db)):
@@ -166,14 +175,6 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
     """Register a new user"""
     logger.info(f"Register request received: username={request.username}, role={request.role}, company_id={request.company_id}")
     
-    # Check if user already exists
-    existing_user = db.query(User).filter(User.username == request.username).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already exists"
-        )
-    
     role = _normalize_role(request.role)
     if not role:
         raise HTTPException(
@@ -183,8 +184,24 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
     company_id = _parse_company_code(request.company_id)
 
-    company = db.query(Company).filter(Company.id == company_id).first()
-    if not company and role in ["ceo", "admin"]:
+    # Username and existing-CEO checks share one round trip; the unique
+    # constraint on username still backs this up via IntegrityError below.
+    username_taken, company_has_ceo = db.execute(select(
+        exists().where(User.username == request.username),
+        exists().where(User.company_id == company_id, User.role.in_(sorted(COMPANY_LEADER_ROLES))),
+    )).one()
+    if username_taken:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already exists"
+        )
+
+    # Load the company's sectors with it so the sector checks below need no extra queries.
+    company = db.query(Company)\
+        .options(joinedload(Company.sectors))\
+        .filter(Company.id == company_id)\
+        .first()
+    if not company and role in COMPANY_LEADER_ROLES:
         company = Company(
             id=company_id,
             name=request.company_id,
@@ -200,27 +217,22 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
     sector_id = request.sector_id
     if role == "sector_head":
-        if sector_id is None:
-            sector = db.query(Sector).filter(Sector.company_id == company.id).first()
-            if sector:
-                sector_id = sector.id
+        if sector_id is None and company.sectors:
+            sector_id = min(sector.id for sector in company.sectors)
     else:
         sector_id = None
 
     if sector_id is not None:
-        sector_exists = db.query(Sector).filter(Sector.id == sector_id).first()
+        sector_exists = any(sector.id == sector_id for sector in company.sectors) or \
+            db.query(Sector.id).filter(Sector.id == sector_id).first() is not None
         if not sector_exists:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid sector_id"
             )
 
-    if role in ["ceo", "admin"]:
-        existing_company_ceo = db.query(User).filter(
-            User.company_id == company.id,
-            User.role.in_(["ceo", "admin"])
-        ).first()
-        if existing_company_ceo:
+    if role in COMPANY_LEADER_ROLES:
+        if company_has_ceo:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="CEO already exists for this company. Register as another role and request approval."
@@ -235,6 +247,7 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
         )
         try:
             db.add(new_user)
+            bump_data_version(db, company.id)
             db.commit()
             db.refresh(new_user)
         except IntegrityError:
@@ -287,15 +300,21 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
         "request_id": join_request.id
     }
 
+AVAILABLE_ROLES = [
+    {"value": "CEO", "label": "CEO"},
+    {"value": "Data Analyst", "label": "Data Analyst"},
+    {"value": "Sales Manager", "label": "Sales Manager"},
+    {"value": "Sector Head", "label": "Sector Head"},
+]
+
+# The role list never changes, so encode it once; each request still gets its
+# own Response, since middleware mutates response headers in place.
+_ROLES_BODY = json.dumps(AVAILABLE_ROLES, separators=(",", ":")).encode("utf-8")
+
 @router.get("/roles")
 def get_roles():
     """Get available roles for frontend"""
-    return [
-        {"value": "CEO", "label": "CEO"},
-        {"value": "Data Analyst", "label": "Data Analyst"},
-        {"value": "Sales Manager", "label": "Sales Manager"},
-        {"value": "Sector Head", "label": "Sector Head"},
-    ]
+    return Response(content=_ROLES_BODY, media_type="application/json")
 
 
 @router.get("/join-requests")
@@ -303,18 +322,31 @@ def get_join_requests(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    if current_user.role not in ["ceo", "admin"]:
+    if current_user.role not in COMPANY_LEADER_ROLES:
         raise HTTPException(status_code=403, detail="Only CEO/Admin can view join requests")
 
-    rows = db.query(CompanyJoinRequest).filter(
+    # Only scalar columns are returned, so select them as tuples instead of
+    # hydrating ORM objects whose relationships could lazy-load per row.
+    rows = db.query(
+        CompanyJoinRequest.id,
+        CompanyJoinRequest.username,
+        CompanyJoinRequest.requested_role,
+        CompanyJoinRequest.company_id,
+        CompanyJoinRequest.sector_id,
+        CompanyJoinRequest.status,
+        CompanyJoinRequest.reviewed_by,
+        CompanyJoinRequest.reviewed_at,
+        CompanyJoinRequest.created_at,
+    ).filter(
         CompanyJoinRequest.company_id == current_user.company_id
     ).order_by(CompanyJoinRequest.created_at.desc()).all()
 
+    role_label = ROLE_MAPPING.get
     return [
         {
             "id": row.id,
             "username": row.username,
-            "requested_role": ROLE_MAPPING.get(row.requested_role, row.requested_role),
+            "requested_role": role_label(row.requested_role, row.requested_role),
             "requested_role_key": row.requested_role,
             "company_id": row.company_id,
             "sector_id": row.sector_id,
@@ -334,7 +366,7 @@ def review_join_request(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    if current_user.role not in ["ceo", "admin"]:
+    if current_user.role not in COMPANY_LEADER_ROLES:
         raise HTTPException(status_code=403, detail="Only CEO/Admin can review join requests")
 
     join_request = db.query(CompanyJoinRequest).filter(
@@ -347,7 +379,7 @@ def review_join_request(
         raise HTTPException(status_code=400, detail="Join request already reviewed")
 
     action = (review.action or "").strip().lower()
-    if action not in ["approve", "reject"]:
+    if action not in REVIEW_ACTIONS:
         raise HTTPException(status_code=400, detail="Invalid action. Use approve or reject.")
 
     if action == "reject":
@@ -388,6 +420,7 @@ def review_join_request(
     join_request.sector_id = final_sector_id
     join_request.reviewed_by = current_user.id
     join_request.reviewed_at = datetime.utcnow()
+    bump_data_version(db, join_request.company_id)
     db.commit()
 
     return {"status": "approved", "message": "Join request approved and user created."}
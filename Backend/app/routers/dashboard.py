@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from sqlalchemy import func
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import case, func, insert, select
 
-from app.database import SessionLocal
 from app.models import (
-    User, Sector, Product, RawData, CleanedData, DataQualityScore,
+    Company, User, Sector, Product, RawData, CleanedData, DataQualityScore,
     AIPrediction, AIRecommendation, FeedbackLog, CompanyAnnouncement, UserSetting
 )
-from app.dependencies import get_current_user, require_sector_head, require_ceo, require_admin
+from app.dependencies import COMPANY_LEADER_ROLES, bump_data_version, get_current_user, get_db, require_sector_head, require_ceo, require_admin, get_allowed_sector_ids
+from app.cache import cache_delete_prefix, cache_get, cache_set, dashboard_cache_prefix
 from app.services.feedback_learning import FeedbackLearningEngine
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+    HAS_ORJSON = False
+
 router = APIRouter()
 
 
@@ -21,47 +32,93 @@ class AnnouncementCreateRequest(BaseModel):
     message: str
 
 
+class AnnouncementResponse(BaseModel):
+    id: int
+    title: str
+    message: str
+    created_by: int
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class SettingsUpdateRequest(BaseModel):
     settings: dict
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
+def _json_response(payload: Dict[str, Any]) -> Response:
+    """Serialize a dashboard payload straight to JSON bytes, skipping jsonable_encoder."""
+    if HAS_ORJSON:
+        return Response(content=orjson.dumps(payload), media_type="application/json")
+    return JSONResponse(content=jsonable_encoder(payload))
 
-def _allowed_sector_ids(db: Session, current_user: User) -> List[int]:
-    query = db.query(Sector.id).filter(Sector.company_id == current_user.company_id)
-    if current_user.role == "sector_head":
-        query = query.filter(Sector.id == current_user.sector_id)
-    return [row[0] for row in query.all()]
 
+def _uploader_ids_subquery(current_user: User):
+    # Same-company, same-role uploaders as a subquery, so callers filter with
+    # uploaded_by IN (SELECT ...) instead of fetching ids and inlining them.
+    return select(User.id).where(
+        User.company_id == current_user.company_id,
+        User.role == current_user.role,
+    )
+
+
+def _dashboard_etag(db: Session, user: User) -> str:
+    """Version the company-wide dashboards by the company's data_version counter."""
+    # Every write the leader dashboards read calls bump_data_version, so one
+    # primary-key lookup stands in for checking the tables themselves.
+    version = db.query(Company.data_version).filter(Company.id == user.company_id).scalar() or 0
+    key = f"{user.id}:{user.role}:{user.company_id}:{user.sector_id}:{version}"
+    return '"%s"' % hashlib.md5(key.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def _cached_dashboard(key: str, build: Callable[[], Response]) -> Response:
+    """Serve a rendered dashboard from the response cache, building and storing it on a miss."""
+    cached = cache_get(key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    response = build()
+    cache_set(key, response.body)
+    return response
 
-def _allowed_uploader_ids(db: Session, current_user: User) -> List[int]:
-    return [
-        row[0]
-        for row in db.query(User.id).filter(
-            User.company_id == current_user.company_id,
-            User.role == current_user.role,
-        ).all()
-    ]
 
 @router.get("/")
-async def get_dashboard(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_dashboard(request: Request, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get role-based dashboard data"""
 
+    cache_prefix = dashboard_cache_prefix(current_user.company_id)
     if current_user.role == 'sector_head':
-        return await get_sector_head_dashboard(current_user, db)
-    elif current_user.role == 'ceo':
-        return await get_ceo_dashboard(current_user, db)
-    elif current_user.role == 'admin':
-        return await get_admin_dashboard(current_user, db)
-    else:
+        # Short-TTL entry, dropped early by uploads, deletes, feedback and announcements.
+        return _cached_dashboard(
+            f"{cache_prefix}{current_user.id}:{current_user.role}",
+            lambda: get_sector_head_dashboard(current_user, db),
+        )
+    if current_user.role not in COMPANY_LEADER_ROLES:
         raise HTTPException(status_code=403, detail="Invalid user role")
 
-async def get_sector_head_dashboard(user: User, db: Session) -> Dict[str, Any]:
+    # CEO/admin payloads are expensive aggregates, so revalidate before rebuilding them.
+    etag = _dashboard_etag(db, current_user)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    build = get_ceo_dashboard if current_user.role == 'ceo' else get_admin_dashboard
+    # Keyed by the ETag, so a cached body always matches the data version it is served with.
+    version = etag.strip('"')
+    response = _cached_dashboard(
+        f"{cache_prefix}{current_user.id}:{version}",
+        lambda: build(current_user, db),
+    )
+    response.headers.update(headers)
+    return response
+
+def get_sector_head_dashboard(user: User, db: Session) -> Response:
     """Sector Head Dashboard: Sector-specific data and insights"""
 
     # Get sector data
@@ -69,27 +126,51 @@ async def get_sector_head_dashboard(user: User, db: Session) -> Dict[str, Any]:
     if not sector:
         raise HTTPException(status_code=404, detail="Sector not found")
 
-    uploader_ids = _allowed_uploader_ids(db, user)
-    if not uploader_ids:
-        uploader_ids = [-1]
+    uploader_ids = _uploader_ids_subquery(user)
 
-    # Recent uploads
-    recent_uploads = db.query(RawData).filter(
+    # Recent uploads; stored row_count (or a database-side count for older rows) keeps the data blob unloaded
+    recent_uploads = db.query(
+        RawData.id,
+        RawData.uploaded_at,
+        func.coalesce(RawData.row_count, func.json_array_length(RawData.data), 0).label("data_points"),
+    ).filter(
         RawData.sector_id == user.sector_id,
         RawData.uploaded_by.in_(uploader_ids),
     )\
         .order_by(RawData.uploaded_at.desc()).limit(5).all()
 
-    # Cleaned data summary
-    cleaned_count = db.query(func.count(CleanedData.id))\
-        .join(RawData, CleanedData.raw_data_id == RawData.id)\
-        .filter(
-            RawData.sector_id == user.sector_id,
-            RawData.uploaded_by.in_(uploader_ids),
-        ).scalar()
-
-    # AI predictions for sector
-    predictions = db.query(AIPrediction)\
+    # Upload, cleaned data and prediction counts plus data quality scores in one round trip
+    sector_scope = (
+        RawData.sector_id == user.sector_id,
+        RawData.uploaded_by.in_(uploader_ids),
+    )
+    upload_count, cleaned_count, avg_quality, prediction_count = db.execute(select(
+        select(func.count(RawData.id))
+            .where(*sector_scope)
+            .scalar_subquery(),
+        select(func.count(CleanedData.id))
+            .join(RawData, CleanedData.raw_data_id == RawData.id)
+            .where(*sector_scope)
+            .scalar_subquery(),
+        select(func.avg(DataQualityScore.score))
+            .join(CleanedData, DataQualityScore.cleaned_data_id == CleanedData.id)
+            .join(RawData, CleanedData.raw_data_id == RawData.id)
+            .where(*sector_scope)
+            .scalar_subquery(),
+        select(func.count(func.distinct(AIPrediction.id)))
+            .join(RawData, RawData.sector_id == AIPrediction.sector_id)
+            .where(AIPrediction.sector_id == user.sector_id, RawData.uploaded_by.in_(uploader_ids))
+            .scalar_subquery(),
+    )).one()
+    avg_quality = avg_quality or 0
+
+    # Latest AI predictions for display; id keeps DISTINCT per prediction without loading prediction_data
+    predictions = db.query(
+        AIPrediction.id,
+        AIPrediction.prediction_type,
+        AIPrediction.confidence,
+        AIPrediction.predicted_at,
+    )\
         .join(RawData, RawData.sector_id == AIPrediction.sector_id)\
         .filter(
             AIPrediction.sector_id == user.sector_id,
@@ -98,65 +179,64 @@ async def get_sector_head_dashboard(user: User, db: Session) -> Dict[str, Any]:
         .distinct()\
         .order_by(AIPrediction.predicted_at.desc()).limit(3).all()
 
-    # Data quality scores
-    avg_quality = db.query(func.avg(DataQualityScore.score))\
-        .join(CleanedData, DataQualityScore.cleaned_data_id == CleanedData.id)\
-        .join(RawData, CleanedData.raw_data_id == RawData.id)\
-        .filter(
-            RawData.sector_id == user.sector_id,
-            RawData.uploaded_by.in_(uploader_ids),
-        ).scalar() or 0
-
-    return {
+    return _json_response({
         "role": "sector_head",
         "sector": {
             "id": sector.id,
             "name": sector.name
         },
         "summary": {
-            "total_uploads": len(recent_uploads),
+            "total_uploads": upload_count,
             "cleaned_datasets": cleaned_count,
             "avg_data_quality": round(avg_quality, 2),
-            "active_predictions": len(predictions)
+            "active_predictions": prediction_count
         },
         "recent_uploads": [
             {
                 "id": upload.id,
-                "uploaded_at": upload.uploaded_at.isoformat(),
-                "data_points": len(upload.data) if upload.data else 0
+                "uploaded_at": upload.uploaded_at,
+                "data_points": upload.data_points
             } for upload in recent_uploads
         ],
         "predictions": [
             {
                 "type": pred.prediction_type,
                 "confidence": pred.confidence,
-                "predicted_at": pred.predicted_at.isoformat()
+                "predicted_at": pred.predicted_at
             } for pred in predictions
         ]
-    }
+    })
 
-async def get_ceo_dashboard(user: User, db: Session) -> Dict[str, Any]:
+def get_ceo_dashboard(user: User, db: Session) -> Response:
     """CEO Dashboard: Company-wide aggregated view"""
 
-    allowed_sector_ids = _allowed_sector_ids(db, user)
-    uploader_ids = _allowed_uploader_ids(db, user)
-    if not allowed_sector_ids or not uploader_ids:
-        company_sector_ids = [-1]
-    else:
-        company_sector_ids = [
-            row[0]
-            for row in db.query(RawData.sector_id).filter(
-                RawData.sector_id.in_(allowed_sector_ids),
-                RawData.uploaded_by.in_(uploader_ids),
-            ).distinct().all()
-        ] or [-1]
-
-    total_sectors = db.query(func.count(Sector.id)).filter(Sector.id.in_(company_sector_ids)).scalar()
-    total_products = db.query(func.count(Product.id)).filter(Product.sector_id.in_(company_sector_ids)).scalar()
-    total_uploads = db.query(func.count(RawData.id)).filter(
-        RawData.sector_id.in_(company_sector_ids),
-        RawData.uploaded_by.in_(uploader_ids if uploader_ids else [-1]),
-    ).scalar()
+    allowed_sector_ids = get_allowed_sector_ids(db, user)
+    uploader_ids = _uploader_ids_subquery(user)
+    company_sector_ids = [
+        row[0]
+        for row in db.query(RawData.sector_id).filter(
+            RawData.sector_id.in_(allowed_sector_ids),
+            RawData.uploaded_by.in_(uploader_ids),
+        ).distinct().all()
+    ] if allowed_sector_ids else []
+    if not company_sector_ids:
+        # Every aggregate below is scoped to these sectors, so skip them outright.
+        return _json_response({
+            "role": "ceo",
+            "company_overview": {"total_sectors": 0, "total_products": 0, "total_uploads": 0},
+            "sector_comparison": [],
+            "ai_insights": {"recommendations": [], "prediction_summary": []},
+        })
+
+    # All three overview counts in one round trip.
+    total_sectors, total_products, total_uploads = db.execute(select(
+        select(func.count(Sector.id)).where(Sector.id.in_(company_sector_ids)).scalar_subquery(),
+        select(func.count(Product.id)).where(Product.sector_id.in_(company_sector_ids)).scalar_subquery(),
+        select(func.count(RawData.id)).where(
+            RawData.sector_id.in_(company_sector_ids),
+            RawData.uploaded_by.in_(uploader_ids),
+        ).scalar_subquery(),
+    )).one()
 
     # Sector performance comparison
     sector_stats = db.query(
@@ -168,7 +248,7 @@ async def get_ceo_dashboard(user: User, db: Session) -> Dict[str, Any]:
      .outerjoin(DataQualityScore, CleanedData.id == DataQualityScore.cleaned_data_id)\
      .filter(
          Sector.id.in_(company_sector_ids),
-         RawData.uploaded_by.in_(uploader_ids if uploader_ids else [-1]),
+         RawData.uploaded_by.in_(uploader_ids),
      )\
      .group_by(Sector.id, Sector.name).all()
 
@@ -178,7 +258,7 @@ async def get_ceo_dashboard(user: User, db: Session) -> Dict[str, Any]:
         .join(RawData, RawData.sector_id == AIPrediction.sector_id)\
         .filter(
             AIPrediction.sector_id.in_(company_sector_ids),
-            RawData.uploaded_by.in_(uploader_ids if uploader_ids else [-1]),
+            RawData.uploaded_by.in_(uploader_ids),
         )\
         .distinct()\
         .order_by(AIRecommendation.created_at.desc()).limit(5).all()
@@ -191,79 +271,81 @@ async def get_ceo_dashboard(user: User, db: Session) -> Dict[str, Any]:
     ).join(RawData, RawData.sector_id == AIPrediction.sector_id)\
      .filter(
          AIPrediction.sector_id.in_(company_sector_ids),
-         RawData.uploaded_by.in_(uploader_ids if uploader_ids else [-1]),
+         RawData.uploaded_by.in_(uploader_ids),
      )\
      .group_by(AIPrediction.prediction_type).all()
 
-    return {
+    return _json_response({
         "role": "ceo",
         "company_overview": {
             "total_sectors": total_sectors,
             "total_products": total_products,
             "total_uploads": total_uploads
         },
+        # Rows are unpacked straight into the payload; float() keeps a driver
+        # Decimal average encodable by orjson.
         "sector_comparison": [
             {
-                "sector": stat[0],
-                "uploads": stat[1],
-                "avg_quality": round(stat[2] or 0, 2)
-            } for stat in sector_stats
+                "sector": name,
+                "uploads": uploads,
+                "avg_quality": round(float(avg_quality or 0), 2)
+            } for name, uploads, avg_quality in sector_stats
         ],
         "ai_insights": {
             "recommendations": [
                 {
                     "text": rec.recommendation_text,
                     "explanation": rec.explanation,
-                    "created_at": rec.created_at.isoformat()
+                    "created_at": rec.created_at
                 } for rec in recommendations
             ],
             "prediction_summary": [
                 {
-                    "type": pred[0],
-                    "avg_confidence": round(pred[1] or 0, 2),
-                    "count": pred[2]
-                } for pred in prediction_summary
+                    "type": prediction_type,
+                    "avg_confidence": round(float(avg_confidence or 0), 2),
+                    "count": count
+                } for prediction_type, avg_confidence, count in prediction_summary
             ]
         }
-    }
+    })
 
-async def get_admin_dashboard(user: User, db: Session) -> Dict[str, Any]:
+def get_admin_dashboard(user: User, db: Session) -> Response:
     """Admin Dashboard: System monitoring and user management"""
 
-    uploader_ids = _allowed_uploader_ids(db, user)
-    if not uploader_ids:
-        uploader_ids = [-1]
+    uploader_ids = _uploader_ids_subquery(user)
 
     # User statistics
-    total_users = db.query(func.count(User.id)).filter(User.company_id == user.company_id).scalar()
-    users_by_role = db.query(User.role, func.count(User.id))\
-        .filter(User.company_id == user.company_id)\
-        .group_by(User.role).all()
+    users_by_role = {
+        role: count
+        for role, count in db.query(User.role, func.count(User.id))
+            .filter(User.company_id == user.company_id)
+            .group_by(User.role)
+    }
+    # Every company user falls in exactly one role group.
+    total_users = sum(users_by_role.values())
 
-    # System health
-    company_sector_ids = [row[0] for row in db.query(Sector.id).filter(Sector.company_id == user.company_id).all()]
-    if not company_sector_ids:
-        company_sector_ids = [-1]
-    total_raw_data = db.query(func.count(RawData.id)).filter(
-        RawData.sector_id.in_(company_sector_ids),
+    # System health: the company's sectors stay a subquery and all three
+    # figures come back from a single statement.
+    company_scope = (
+        RawData.sector_id.in_(select(Sector.id).where(Sector.company_id == user.company_id)),
         RawData.uploaded_by.in_(uploader_ids),
-    ).scalar()
-    total_cleaned_data = db.query(func.count(CleanedData.id))\
-        .join(RawData, CleanedData.raw_data_id == RawData.id)\
-        .filter(
-            RawData.sector_id.in_(company_sector_ids),
-            RawData.uploaded_by.in_(uploader_ids),
-        ).scalar()
-    avg_system_quality = db.query(func.avg(DataQualityScore.score))\
-        .join(CleanedData, DataQualityScore.cleaned_data_id == CleanedData.id)\
-        .join(RawData, CleanedData.raw_data_id == RawData.id)\
-        .filter(
-            RawData.sector_id.in_(company_sector_ids),
-            RawData.uploaded_by.in_(uploader_ids),
-        ).scalar() or 0
+    )
+    total_raw_data, total_cleaned_data, avg_system_quality = db.execute(select(
+        select(func.count(RawData.id)).where(*company_scope).scalar_subquery(),
+        select(func.count(CleanedData.id))
+            .join(RawData, CleanedData.raw_data_id == RawData.id)
+            .where(*company_scope)
+            .scalar_subquery(),
+        select(func.avg(DataQualityScore.score))
+            .join(CleanedData, DataQualityScore.cleaned_data_id == CleanedData.id)
+            .join(RawData, CleanedData.raw_data_id == RawData.id)
+            .where(*company_scope)
+            .scalar_subquery(),
+    )).one()
+    avg_system_quality = avg_system_quality or 0
 
     # Recent feedback
-    recent_feedback = db.query(FeedbackLog)\
+    recent_feedback = db.query(FeedbackLog.user_id, FeedbackLog.feedback_type, FeedbackLog.timestamp)\
         .join(User, User.id == FeedbackLog.user_id)\
         .filter(
             User.company_id == user.company_id,
@@ -279,56 +361,51 @@ async def get_admin_dashboard(user: User, db: Session) -> Dict[str, Any]:
         "avg_quality_score": round(avg_system_quality, 2)
     }
 
-    return {
+    return _json_response({
         "role": "admin",
         "user_management": {
             "total_users": total_users,
-            "users_by_role": dict(users_by_role)
+            "users_by_role": users_by_role
         },
         "system_health": processing_stats,
         "recent_feedback": [
             {
                 "user_id": fb.user_id,
                 "feedback_type": fb.feedback_type,
-                "timestamp": fb.timestamp.isoformat()
+                "timestamp": fb.timestamp
             } for fb in recent_feedback
         ]
-    }
+    })
 
 @router.get("/admin/quick-stats")
-async def get_admin_quick_stats(current_user: User = Depends(require_admin), db: Session = Depends(get_db)):
+def get_admin_quick_stats(current_user: User = Depends(require_admin), db: Session = Depends(get_db)):
     """Get quick stats for admin sidebar"""
 
     # New users (users created in last 30 days)
     from datetime import datetime, timedelta
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    uploader_ids = _allowed_uploader_ids(db, current_user)
-    if not uploader_ids:
-        uploader_ids = [-1]
-    new_users = db.query(func.count(User.id))\
-        .filter(
-            User.created_at >= thirty_days_ago,
+    new_users_count = select(func.count(User.id)).where(
+        User.created_at >= thirty_days_ago,
+        User.company_id == current_user.company_id,
+        User.role == current_user.role,
+    ).scalar_subquery()
+
+    # One round trip: the new-user count rides along as a scalar subquery, and
+    # pending reports (corrections) / system alerts (recent feedback) are
+    # conditional counts over the same feedback join.
+    new_users, pending_reports, system_alerts = db.execute(
+        select(
+            new_users_count,
+            func.count(case((FeedbackLog.feedback_type == 'correction', FeedbackLog.id))),
+            func.count(case((FeedbackLog.timestamp >= thirty_days_ago, FeedbackLog.id))),
+        )
+        .select_from(FeedbackLog)
+        .join(User, User.id == FeedbackLog.user_id)
+        .where(
             User.company_id == current_user.company_id,
             User.role == current_user.role,
-        ).scalar()
-
-    # Pending reports (assuming reports that are not processed or something - using recent reports)
-    pending_reports = db.query(func.count(FeedbackLog.id))\
-        .join(User, User.id == FeedbackLog.user_id)\
-        .filter(
-            FeedbackLog.feedback_type == 'correction',
-            User.company_id == current_user.company_id,
-            User.id.in_(uploader_ids),
-        ).scalar()
-
-    # System alerts (recent feedback logs)
-    system_alerts = db.query(func.count(FeedbackLog.id))\
-        .join(User, User.id == FeedbackLog.user_id)\
-        .filter(
-            FeedbackLog.timestamp >= thirty_days_ago,
-            User.company_id == current_user.company_id,
-            User.id.in_(uploader_ids),
-        ).scalar()
+        )
+    ).one()
 
     return {
         "pendingReports": pending_reports,
@@ -337,7 +414,7 @@ async def get_admin_quick_stats(current_user: User = Depends(require_admin), db:
     }
 
 @router.post("/feedback")
-async def submit_feedback(
+def submit_feedback(
     data_id: int,
     feedback_type: str,
     feedback_data: Dict[str, Any],
@@ -353,59 +430,66 @@ async def submit_feedback(
         feedback_data=feedback_data
     )
     db.add(feedback_entry)
+    bump_data_version(db, current_user.company_id)
     db.commit()
+    cache_delete_prefix(dashboard_cache_prefix(current_user.company_id))
 
     return {"message": "Feedback submitted successfully"}
 
 
-@router.get("/announcements")
-async def get_announcements(
+@router.get("/announcements", response_model=List[AnnouncementResponse])
+def get_announcements(
+    before: Optional[datetime] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    rows = db.query(CompanyAnnouncement).filter(
+    """Latest company announcements; pass the last item's created_at as before for the next page."""
+    query = db.query(
+        CompanyAnnouncement.id,
+        CompanyAnnouncement.title,
+        CompanyAnnouncement.message,
+        CompanyAnnouncement.created_by,
+        CompanyAnnouncement.created_at,
+    ).filter(
         CompanyAnnouncement.company_id == current_user.company_id
-    ).order_by(CompanyAnnouncement.created_at.desc()).limit(50).all()
-    return [
-        {
-            "id": row.id,
-            "title": row.title,
-            "message": row.message,
-            "created_by": row.created_by,
-            "created_at": row.created_at.isoformat() if row.created_at else None,
-        }
-        for row in rows
-    ]
+    )
+    if before is not None:
+        # Keyset cursor: seeks into idx_announcement_company_time instead of skipping rows.
+        query = query.filter(CompanyAnnouncement.created_at < before)
+    return query.order_by(CompanyAnnouncement.created_at.desc()).limit(50).all()
 
 
-@router.post("/announcements")
-async def create_announcement(
+@router.post("/announcements", response_model=AnnouncementResponse)
+def create_announcement(
     payload: AnnouncementCreateRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    if current_user.role not in ["ceo", "admin"]:
+    if current_user.role not in COMPANY_LEADER_ROLES:
         raise HTTPException(status_code=403, detail="Only CEO/Admin can post announcements")
-    row = CompanyAnnouncement(
-        company_id=current_user.company_id,
-        title=payload.title,
-        message=payload.message,
-        created_by=current_user.id,
-    )
-    db.add(row)
+    company_id = current_user.company_id
+    # INSERT ... RETURNING hands back the generated id/created_at without a refresh SELECT.
+    row = db.execute(
+        insert(CompanyAnnouncement).values(
+            company_id=company_id,
+            title=payload.title,
+            message=payload.message,
+            created_by=current_user.id,
+        ).returning(
+            CompanyAnnouncement.id,
+            CompanyAnnouncement.title,
+            CompanyAnnouncement.message,
+            CompanyAnnouncement.created_by,
+            CompanyAnnouncement.created_at,
+        )
+    ).one()
     db.commit()
-    db.refresh(row)
-    return {
-        "id": row.id,
-        "title": row.title,
-        "message": row.message,
-        "created_by": row.created_by,
-        "created_at": row.created_at.isoformat() if row.created_at else None,
-    }
+    cache_delete_prefix(dashboard_cache_prefix(company_id))
+    return row
 
 
 @router.get("/settings")
-async def get_user_settings(
+def get_user_settings(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -441,7 +525,7 @@ async def get_user_settings(
 
 
 @router.put("/settings")
-async def update_user_settings(
+def update_user_settings(
     payload: SettingsUpdateRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -1,11 +1,12 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, List, Optional
 
-from app.dependencies import get_db, get_current_user
-from app.models import User, CompanyReport, RawData, CleanedData, Sector, AIPrediction
+from app.dependencies import get_db, get_current_user, get_allowed_sector_ids, get_allowed_uploader_ids
+from app.models import User, CompanyReport, RawData, CleanedData, AIPrediction
 
 router = APIRouter()
 
@@ -16,45 +17,40 @@ class ReportCreateRequest(BaseModel):
     notes: Optional[str] = None
 
 
-def _allowed_sector_ids(db: Session, current_user: User):
-    query = db.query(Sector.id).filter(Sector.company_id == current_user.company_id)
-    if current_user.role == "sector_head":
-        query = query.filter(Sector.id == current_user.sector_id)
-    return [row[0] for row in query.all()]
+class ReportResponse(BaseModel):
+    id: int
+    title: str
+    report_type: str
+    created_by: int
+    created_at: Optional[datetime] = None
+    summary: Any = Field(default=None, validation_alias="payload")
+
+    model_config = ConfigDict(from_attributes=True)
 
 
-def _allowed_uploader_ids(db: Session, current_user: User):
-    return [
-        row[0]
-        for row in db.query(User.id).filter(
-            User.company_id == current_user.company_id,
-            User.role == current_user.role,
-        ).all()
-    ]
+# Reports are read as column tuples: no ORM hydration, and nothing that could lazy-load per row.
+_REPORT_COLUMNS = (
+    CompanyReport.id,
+    CompanyReport.title,
+    CompanyReport.report_type,
+    CompanyReport.created_by,
+    CompanyReport.created_at,
+    CompanyReport.payload,
+)
 
 
-@router.get("/")
+@router.get("/", response_model=List[ReportResponse])
 def list_reports(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    rows = db.query(CompanyReport).join(
+    # Rows go straight to the response model; pydantic-core serializes the whole list.
+    return db.query(*_REPORT_COLUMNS).join(
         User, User.id == CompanyReport.created_by
     ).filter(
         CompanyReport.company_id == current_user.company_id,
         User.role == current_user.role,
     ).order_by(CompanyReport.created_at.desc()).all()
-    return [
-        {
-            "id": row.id,
-            "title": row.title,
-            "report_type": row.report_type,
-            "created_by": row.created_by,
-            "created_at": row.created_at.isoformat() if row.created_at else None,
-            "summary": row.payload,
-        }
-        for row in rows
-    ]
 
 
 @router.post("/generate")
@@ -63,35 +59,35 @@ def generate_report(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    sector_ids = _allowed_sector_ids(db, current_user) or [-1]
-    uploader_ids = _allowed_uploader_ids(db, current_user) or [-1]
-
-    total_uploads = db.query(RawData).filter(
-        RawData.sector_id.in_(sector_ids),
-        RawData.uploaded_by.in_(uploader_ids),
-    ).count()
-    total_cleaned = db.query(CleanedData).join(
-        RawData, CleanedData.raw_data_id == RawData.id
-    ).filter(
-        RawData.sector_id.in_(sector_ids),
-        RawData.uploaded_by.in_(uploader_ids),
-    ).count()
-    total_predictions = db.query(AIPrediction).join(
-        RawData, RawData.sector_id == AIPrediction.sector_id
-    ).filter(
-        RawData.sector_id.in_(sector_ids),
-        RawData.uploaded_by.in_(uploader_ids),
-        AIPrediction.sector_id.in_(sector_ids)
-    ).distinct().count()
-    avg_quality = db.query(CleanedData).join(
-        RawData, CleanedData.raw_data_id == RawData.id
-    ).filter(
-        RawData.sector_id.in_(sector_ids),
-        RawData.uploaded_by.in_(uploader_ids),
-    ).all()
-    quality_score = round(
-        (sum((row.quality_score or 0) for row in avg_quality) / len(avg_quality) * 100), 2
-    ) if avg_quality else 0.0
+    sector_ids = get_allowed_sector_ids(db, current_user)
+    uploader_ids = get_allowed_uploader_ids(db, current_user)
+
+    total_uploads = total_cleaned = total_predictions = 0
+    avg_quality = None
+    # An empty scope can only produce zeros, so the metric queries are skipped.
+    if sector_ids and uploader_ids:
+        total_uploads = db.query(RawData).filter(
+            RawData.sector_id.in_(sector_ids),
+            RawData.uploaded_by.in_(uploader_ids),
+        ).count()
+        # Count and average come back from one aggregate instead of loading every cleaned row.
+        total_cleaned, avg_quality = db.query(
+            func.count(CleanedData.id),
+            func.avg(CleanedData.quality_score),
+        ).join(
+            RawData, CleanedData.raw_data_id == RawData.id
+        ).filter(
+            RawData.sector_id.in_(sector_ids),
+            RawData.uploaded_by.in_(uploader_ids),
+        ).one()
+        total_predictions = db.query(AIPrediction).join(
+            RawData, RawData.sector_id == AIPrediction.sector_id
+        ).filter(
+            RawData.sector_id.in_(sector_ids),
+            RawData.uploaded_by.in_(uploader_ids),
+            AIPrediction.sector_id.in_(sector_ids)
+        ).distinct().count()
+    quality_score = round(float(avg_quality) * 100, 2) if avg_quality is not None else 0.0
 
     summary = {
         "generated_at": datetime.utcnow().isoformat(),
@@ -104,33 +100,34 @@ def generate_report(
         },
     }
 
-    report = CompanyReport(
-        company_id=current_user.company_id,
-        title=payload.title,
-        report_type=payload.report_type,
-        payload=summary,
-        created_by=current_user.id,
-    )
-    db.add(report)
+    # INSERT ... RETURNING hands back the generated id/created_at without a refresh SELECT.
+    report_id, created_at = db.execute(
+        insert(CompanyReport).values(
+            company_id=current_user.company_id,
+            title=payload.title,
+            report_type=payload.report_type,
+            payload=summary,
+            created_by=current_user.id,
+        ).returning(CompanyReport.id, CompanyReport.created_at)
+    ).one()
     db.commit()
-    db.refresh(report)
 
     return {
-        "id": report.id,
-        "title": report.title,
-        "report_type": report.report_type,
-        "created_at": report.created_at.isoformat() if report.created_at else None,
-        "summary": report.payload,
+        "id": report_id,
+        "title": payload.title,
+        "report_type": payload.report_type,
+        "created_at": created_at.isoformat() if created_at else None,
+        "summary": summary,
     }
 
 
-@router.get("/{report_id}")
+@router.get("/{report_id}", response_model=ReportResponse)
 def get_report(
     report_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    row = db.query(CompanyReport).join(
+    row = db.query(*_REPORT_COLUMNS).join(
         User, User.id == CompanyReport.created_by
     ).filter(
         CompanyReport.id == report_id,
@@ -139,14 +136,7 @@ def get_report(
     ).first()
     if not row:
         raise HTTPException(status_code=404, detail="Report not found")
-    return {
-        "id": row.id,
-        "title": row.title,
-        "report_type": row.report_type,
-        "created_by": row.created_by,
-        "created_at": row.created_at.isoformat() if row.created_at else None,
-        "summary": row.payload,
-    }
+    return row
 
 
 @router.delete("/{report_id}")
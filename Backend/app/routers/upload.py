@@ -1,52 +1,65 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import Optional
 import pandas as pd
 import numpy as np
-import json
 import math
 from datetime import datetime
 
-from app.database import SessionLocal
 from app.models import RawData, CleanedData, DataQualityScore, Sector, Product, User
-from app.dependencies import get_current_user
+from app.dependencies import bump_data_version, get_current_user, get_db
+from app.cache import RECENT_QUALITY_KEY, cache_delete_prefix, cache_get, cache_set, dashboard_cache_prefix
+from app.services.data_storage import read_csv_upload, read_excel_upload, read_json_upload, records_to_arrow_bytes
+from app.services.profiling import dtype_split, sampled_mean_skew
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# infer_dtype results whose non-missing values are already JSON-native Python objects
+_JSON_NATIVE_INFERRED = frozenset({"string", "boolean", "empty"})
+
+
+def _null_positions(values: list, mask: np.ndarray) -> list:
+    # Patch only the masked slots; most columns have few or no missing values.
+    for index in np.flatnonzero(mask):
+        values[index] = None
+    return values
+
+
+def _json_safe_value(value):
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, np.generic):
+        casted = value.item()
+        if isinstance(casted, float) and not math.isfinite(casted):
+            return None
+        return casted
+    return value
+
 
 def _to_json_safe_records(df: pd.DataFrame):
-    safe_df = df.copy()
-    for col in safe_df.columns:
-        if pd.api.types.is_datetime64_any_dtype(safe_df[col]):
-            safe_df[col] = safe_df[col].dt.strftime("%Y-%m-%dT%H:%M:%S")
-
-    records = safe_df.to_dict("records")
-    normalized = []
-    for row in records:
-        normalized_row = {}
-        for key, value in row.items():
-            if pd.isna(value):
-                normalized_row[key] = None
-            elif isinstance(value, pd.Timestamp):
-                normalized_row[key] = value.isoformat()
-            elif isinstance(value, float) and not math.isfinite(value):
-                normalized_row[key] = None
-            elif isinstance(value, np.generic):
-                casted = value.item()
-                if isinstance(casted, float) and not math.isfinite(casted):
-                    normalized_row[key] = None
-                else:
-                    normalized_row[key] = casted
-            else:
-                normalized_row[key] = value
-        normalized.append(normalized_row)
-    return normalized
+    # Normalize column by column so only object columns pay for a per-cell check,
+    # then zip the rows once instead of building and rewriting to_dict records.
+    columns = []
+    for _, series in df.items():
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            series = series.dt.strftime("%Y-%m-%dT%H:%M:%S")
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind == "f":
+            values = series.to_numpy()
+            columns.append(_null_positions(values.tolist(), ~np.isfinite(values)))
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind in "iub":
+            columns.append(series.tolist())
+        elif pd.api.types.infer_dtype(series, skipna=True) in _JSON_NATIVE_INFERRED:
+            # Pure str/bool columns (checked in C) only need their missing values nulled.
+            columns.append(_null_positions(series.tolist(), series.isna().to_numpy()))
+        else:
+            columns.append([_json_safe_value(value) for value in series.tolist()])
+    keys = list(df.columns)
+    return [dict(zip(keys, row)) for row in zip(*columns)]
 
 
 def _sanitize_json_payload(value):
@@ -69,24 +82,38 @@ def _sanitize_json_payload(value):
         return [_sanitize_json_payload(v) for v in value.tolist()]
     return value
 
+def _recent_quality_average(db: Session) -> float:
+    """Average of the latest 200 quality scores, cached briefly (in-process without Redis) since it drifts slowly."""
+    cached = cache_get(RECENT_QUALITY_KEY, local_fallback=True)
+    if cached is not None:
+        return float(cached)
+    # Averaged in the database: one scalar back instead of 200 hydrated score rows.
+    recent_scores = db.query(DataQualityScore.score)\
+        .order_by(DataQualityScore.timestamp.desc()).limit(200).subquery()
+    avg_quality = float(db.query(func.avg(recent_scores.c.score)).scalar() or 0.0)
+    cache_set(RECENT_QUALITY_KEY, repr(avg_quality).encode(), local_fallback=True)
+    return avg_quality
+
+
 def _adaptive_upload_config(db: Session, df: pd.DataFrame) -> dict:
     from app.services.feedback_learning import FeedbackLearningEngine
     learning_engine = FeedbackLearningEngine()
 
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    numeric_cols, text_cols = dtype_split(df)
+    has_numeric = len(numeric_cols) > 0
+    skewness = sampled_mean_skew(df[numeric_cols]) if has_numeric else 0
     data_characteristics = {
-        "skewness": float(df[numeric_cols].skew().mean()) if len(numeric_cols) > 0 else 0,
-        "distribution": "normal" if len(numeric_cols) > 0 and abs(float(df[numeric_cols].skew().mean())) < 0.8 else "skewed",
-        "needs_normalization": len(numeric_cols) > 0,
+        "skewness": skewness,
+        "distribution": "normal" if has_numeric and abs(skewness) < 0.8 else "skewed",
+        "needs_normalization": has_numeric,
         "needs_standardization": False,
         "has_noise": len(df) > 80,
-        "has_text": len(df.select_dtypes(include=["object"]).columns) > 0,
+        "has_text": len(text_cols) > 0,
     }
     config = learning_engine.get_optimal_cleaning_config(data_characteristics)
 
     # Lightweight feedback learning from historical quality.
-    recent_scores = db.query(DataQualityScore).order_by(DataQualityScore.timestamp.desc()).limit(200).all()
-    avg_quality = float(np.mean([score.score for score in recent_scores])) if recent_scores else 0.0
+    avg_quality = _recent_quality_average(db)
     if avg_quality >= 0.90:
         config["impute_strategy"] = "ml"
         config["outlier_method"] = "zscore"
@@ -112,8 +139,18 @@ def _role_scoped_user_ids_query(db: Session, current_user: User):
         User.role == current_user.role
     )
 
+def _upload_reader(filename: Optional[str]):
+    """Return the parser for an upload's extension, or raise 400 for unsupported formats."""
+    if filename and filename.endswith('.csv'):
+        return read_csv_upload
+    if filename and (filename.endswith('.xlsx') or filename.endswith('.xls')):
+        return read_excel_upload
+    if filename and filename.endswith('.json'):
+        return read_json_upload
+    raise HTTPException(status_code=400, detail="Unsupported file format")
+
 @router.post("/upload")
-async def upload_data(
+def upload_data(
     file: UploadFile = File(...),
     sector_id: int = Form(...),
     product_id: Optional[int] = Form(None),
@@ -122,6 +159,9 @@ async def upload_data(
 ):
     """Upload multi-sector data with metadata tagging"""
 
+    # Pick the parser from the extension first so junk files are refused without a DB round trip
+    read_upload = _upload_reader(file.filename)
+
     sector = db.query(Sector).filter(
         Sector.id == sector_id,
         Sector.company_id == current_user.company_id
@@ -131,16 +171,7 @@ async def upload_data(
     if current_user.role == 'sector_head' and current_user.sector_id != sector_id:
         raise HTTPException(status_code=403, detail="Access denied: Can only upload to assigned sector")
 
-    # Read file based on extension
-    if file.filename.endswith('.csv'):
-        df = pd.read_csv(file.file)
-    elif file.filename.endswith('.xlsx') or file.filename.endswith('.xls'):
-        df = pd.read_excel(file.file)
-    elif file.filename.endswith('.json'):
-        data = json.load(file.file)
-        df = pd.DataFrame(data)
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format")
+    df = read_upload(file.file)
 
     # Metadata tagging
     # Store raw data
@@ -149,18 +180,26 @@ async def upload_data(
         sector_id=sector_id,
         product_id=product_id,
         data=safe_records,  # Store JSON-safe records (no NaN/Inf)
-        uploaded_by=current_user.id
+        data_arrow=records_to_arrow_bytes(safe_records),
+        uploaded_by=current_user.id,
+        row_count=int(len(df)),
+        column_count=int(len(df.columns)),
+        column_names=[str(col) for col in df.columns],
     )
     db.add(raw_data_entry)
+    bump_data_version(db, current_user.company_id)
+    db.flush()
+    # Read the id before commit expires the instance; touching it afterwards would reload the blob.
+    raw_data_id = raw_data_entry.id
     db.commit()
-    db.refresh(raw_data_entry)
+    cache_delete_prefix(dashboard_cache_prefix(current_user.company_id))
 
     # Upload keeps dataset in pending state; cleaning happens from Data Cleaning page.
     optimal_config = _adaptive_upload_config(db, df)
 
     payload = {
         "message": "Data uploaded successfully. Run cleaning from Data Cleaning page.",
-        "raw_data_id": raw_data_entry.id,
+        "raw_data_id": raw_data_id,
         "cleaned_data_id": None,
         "preview": safe_records[:5],
         "quality_scores": {},
@@ -170,40 +209,42 @@ async def upload_data(
     return _sanitize_json_payload(payload)
 
 @router.get("/sectors")
-async def get_sectors(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_sectors(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Get available sectors for upload"""
-    existing_count = db.query(Sector).filter(Sector.company_id == current_user.company_id).count()
-    if existing_count == 0:
+    # Only id/name are rendered; the company-wide list also answers the seeding check.
+    sector_query = db.query(Sector.id, Sector.name).filter(Sector.company_id == current_user.company_id)
+    sectors = sector_query.all()
+    if not sectors:
         default_sectors = ["Sales", "Operations", "Finance", "HR"]
         for name in default_sectors:
             db.add(Sector(name=name, company_id=current_user.company_id))
+        bump_data_version(db, current_user.company_id)
         db.commit()
+        sectors = sector_query.all()
 
-    sector_query = db.query(Sector).filter(Sector.company_id == current_user.company_id)
     if current_user.role == 'sector_head':
-        sector_query = sector_query.filter(Sector.id == current_user.sector_id)
-    sectors = sector_query.all()
+        sectors = [s for s in sectors if s.id == current_user.sector_id]
 
     return [{"id": s.id, "name": s.name} for s in sectors]
 
 @router.get("/products/{sector_id}")
-async def get_products(
+def get_products(
     sector_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get products for a sector"""
-    sector = db.query(Sector).filter(
+    sector = db.query(Sector.id).filter(
         Sector.id == sector_id,
         Sector.company_id == current_user.company_id
     ).first()
     if not sector:
         raise HTTPException(status_code=403, detail="Access denied")
-    products = db.query(Product).filter(Product.sector_id == sector_id).all()
+    products = db.query(Product.id, Product.name).filter(Product.sector_id == sector_id).all()
     return [{"id": p.id, "name": p.name} for p in products]
 
 @router.get("/uploaded-data")
-async def get_uploaded_data(
+def get_uploaded_data(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -216,55 +257,62 @@ async def get_uploaded_data(
             return {"data": [], "total_count": 0}
         if not allowed_user_ids:
             return {"data": [], "total_count": 0}
-        raw_data = db.query(RawData).filter(
-            RawData.sector_id.in_(allowed_sector_ids),
-            RawData.uploaded_by.in_(allowed_user_ids)
-        ).all()
-        
+        # Sector, product and first cleaned variant come back in the same statement,
+        # rather than three follow-up queries per upload.
+        first_cleaned = db.query(
+            CleanedData.raw_data_id,
+            func.min(CleanedData.id).label("cleaned_id"),
+        ).group_by(CleanedData.raw_data_id).subquery()
+        raw_data = db.query(
+            RawData.id,
+            RawData.sector_id,
+            RawData.product_id,
+            RawData.uploaded_by,
+            RawData.uploaded_at,
+            RawData.row_count,
+            RawData.column_names,
+            Sector.name.label("sector_name"),
+            Product.name.label("product_name"),
+            CleanedData.id.label("cleaned_id"),
+            CleanedData.quality_score,
+        ).outerjoin(Sector, Sector.id == RawData.sector_id)\
+            .outerjoin(Product, Product.id == RawData.product_id)\
+            .outerjoin(first_cleaned, first_cleaned.c.raw_data_id == RawData.id)\
+            .outerjoin(CleanedData, CleanedData.id == first_cleaned.c.cleaned_id)\
+            .filter(
+                RawData.sector_id.in_(allowed_sector_ids),
+                RawData.uploaded_by.in_(allowed_user_ids)
+            ).all()
+
+        # Uploads stored before the shape columns existed still need their blob read once.
+        legacy_ids = [row.id for row in raw_data if row.row_count is None]
+        legacy_shapes = {}
+        if legacy_ids:
+            for raw_id, records in db.query(RawData.id, RawData.data).filter(RawData.id.in_(legacy_ids)):
+                records = records if isinstance(records, list) else []
+                columns = list(records[0].keys()) if records and isinstance(records[0], dict) else []
+                legacy_shapes[raw_id] = (len(records), columns)
+
         result = []
         for data in raw_data:
-            try:
-                # Get sector name
-                sector = db.query(Sector).filter(Sector.id == data.sector_id).first()
-                sector_name = sector.name if sector else "Unknown"
-                
-                # Get product name if exists
-                product_name = None
-                if data.product_id:
-                    product = db.query(Product).filter(Product.id == data.product_id).first()
-                    product_name = product.name if product else None
-                
-                # Get cleaned data info
-                cleaned = db.query(CleanedData).filter(CleanedData.raw_data_id == data.id).first()
-                
-                # Safely get row and column counts
-                row_count = 0
-                column_count = 0
-                if data.data and isinstance(data.data, list) and len(data.data) > 0:
-                    row_count = len(data.data)
-                    if isinstance(data.data[0], dict):
-                        column_count = len(data.data[0].keys())
-                
-                result.append({
-                    "id": data.id,
-                    "name": f"dataset_{data.id}.csv",
-                    "sector_id": data.sector_id,
-                    "sector_name": sector_name,
-                    "product_id": data.product_id,
-                    "product_name": product_name,
-                    "uploaded_by": data.uploaded_by,
-                    "uploaded_at": data.uploaded_at.isoformat() if hasattr(data, 'uploaded_at') and data.uploaded_at else None,
-                    "row_count": row_count,
-                    "column_count": column_count,
-                    "columns": list(data.data[0].keys()) if row_count > 0 and isinstance(data.data[0], dict) else [],
-                    "has_cleaned_data": cleaned is not None,
-                    "cleaned_data_id": cleaned.id if cleaned else None,
-                    "quality_score": cleaned.quality_score if cleaned else None
-                })
-            except Exception as item_error:
-                # Skip items that cause errors
-                continue
-        
+            row_count, columns = legacy_shapes.get(data.id, (data.row_count, data.column_names or []))
+            result.append({
+                "id": data.id,
+                "name": f"dataset_{data.id}.csv",
+                "sector_id": data.sector_id,
+                "sector_name": data.sector_name or "Unknown",
+                "product_id": data.product_id,
+                "product_name": data.product_name,
+                "uploaded_by": data.uploaded_by,
+                "uploaded_at": data.uploaded_at.isoformat() if data.uploaded_at else None,
+                "row_count": row_count,
+                "column_count": len(columns),
+                "columns": columns,
+                "has_cleaned_data": data.cleaned_id is not None,
+                "cleaned_data_id": data.cleaned_id,
+                "quality_score": data.quality_score
+            })
+
         return {
             "data": result,
             "total_count": len(result)
@@ -279,7 +327,7 @@ async def get_uploaded_data(
 
 
 @router.delete("/uploaded-data/{data_id}")
-async def delete_uploaded_dataset(
+def delete_uploaded_dataset(
     data_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -298,11 +346,17 @@ async def delete_uploaded_dataset(
     if raw_data.uploaded_by not in allowed_user_ids:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    cleaned_rows = db.query(CleanedData).filter(CleanedData.raw_data_id == raw_data.id).all()
-    for cleaned in cleaned_rows:
-        db.query(DataQualityScore).filter(DataQualityScore.cleaned_data_id == cleaned.id).delete()
-        db.delete(cleaned)
+    # Set-based deletes: one statement per table instead of one per cleaned dataset.
+    cleaned_ids = select(CleanedData.id).where(CleanedData.raw_data_id == raw_data.id)
+    db.query(DataQualityScore).filter(
+        DataQualityScore.cleaned_data_id.in_(cleaned_ids)
+    ).delete(synchronize_session=False)
+    db.query(CleanedData).filter(
+        CleanedData.raw_data_id == raw_data.id
+    ).delete(synchronize_session=False)
 
     db.delete(raw_data)
+    bump_data_version(db, current_user.company_id)
     db.commit()
+    cache_delete_prefix(dashboard_cache_prefix(current_user.company_id))
     return {"message": "Dataset deleted successfully", "deleted_data_id": data_id}
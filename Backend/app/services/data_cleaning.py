@@ -25,11 +25,17 @@ class DataCleaningEngine:
         self.logs.append(log_entry)
         logger.info(f"Data Cleaning: {action} - {details}")
 
+    @staticmethod
+    def _completeness(df: pd.DataFrame) -> float:
+        return df.notna().mean().mean()
+
     def calculate_quality_score(self, df_before: pd.DataFrame, df_after: pd.DataFrame, algorithm: str) -> float:
         """Calculate data quality score based on improvements"""
+        return self._score_completeness(self._completeness(df_before), df_after, algorithm)
+
+    def _score_completeness(self, completeness_before: float, df_after: pd.DataFrame, algorithm: str) -> float:
         # Simple quality score based on completeness and consistency
-        completeness_before = df_before.notna().mean().mean()
-        completeness_after = df_after.notna().mean().mean()
+        completeness_after = self._completeness(df_after)
 
         # Basic score calculation
         score = min(1.0, completeness_after / max(completeness_before, 0.01))
@@ -37,8 +43,9 @@ class DataCleaningEngine:
         return score
 
     # 1. Missing Value Imputation
-    def impute_missing_values(self, df: pd.DataFrame, strategy: str = 'auto') -> pd.DataFrame:
-        df_clean = df.copy()
+    def impute_missing_values(self, df: pd.DataFrame, strategy: str = 'auto', copy: bool = True) -> pd.DataFrame:
+        completeness_before = self._completeness(df)
+        df_clean = df.copy() if copy else df
         numeric_cols = df.select_dtypes(include=[np.number]).columns
         categorical_cols = df.select_dtypes(include=['object']).columns
 
@@ -57,7 +64,7 @@ class DataCleaningEngine:
             imputer_cat = SimpleImputer(strategy='most_frequent')
             df_clean[categorical_cols] = imputer_cat.fit_transform(df_clean[categorical_cols])
 
-        score = self.calculate_quality_score(df, df_clean, 'missing_value_imputation')
+        score = self._score_completeness(completeness_before, df_clean, 'missing_value_imputation')
         self.log_action('missing_value_imputation', {
             'strategy': strategy,
             'columns_affected': len(numeric_cols) + len(categorical_cols),
@@ -66,11 +73,18 @@ class DataCleaningEngine:
         return df_clean
 
     # 2. Duplicate Detection & Removal
-    def remove_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
-        df_clean = df.drop_duplicates()
-        duplicates_removed = len(df) - len(df_clean)
-
-        score = self.calculate_quality_score(df, df_clean, 'duplicate_removal')
+    def remove_duplicates(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        completeness_before = self._completeness(df)
+        rows_before = len(df)
+        if copy:
+            df_clean = df.drop_duplicates()
+        else:
+            # In-place keeps the frame un-flagged as a slice for the in-place steps after it.
+            df.drop_duplicates(inplace=True)
+            df_clean = df
+        duplicates_removed = rows_before - len(df_clean)
+
+        score = self._score_completeness(completeness_before, df_clean, 'duplicate_removal')
         self.log_action('duplicate_removal', {
             'duplicates_removed': duplicates_removed,
             'quality_score': score
@@ -78,8 +92,9 @@ class DataCleaningEngine:
         return df_clean
 
     # 3. Outlier Detection
-    def detect_outliers(self, df: pd.DataFrame, method: str = 'iqr') -> pd.DataFrame:
-        df_clean = df.copy()
+    def detect_outliers(self, df: pd.DataFrame, method: str = 'iqr', copy: bool = True) -> pd.DataFrame:
+        completeness_before = self._completeness(df)
+        df_clean = df.copy() if copy else df
         numeric_cols = df.select_dtypes(include=[np.number]).columns
 
         for col in numeric_cols:
@@ -97,7 +112,7 @@ class DataCleaningEngine:
             upper_bound = df_clean[col].quantile(0.95)
             df_clean[col] = np.clip(df_clean[col], lower_bound, upper_bound)
 
-        score = self.calculate_quality_score(df, df_clean, 'outlier_detection')
+        score = self._score_completeness(completeness_before, df_clean, 'outlier_detection')
         self.log_action('outlier_detection', {
             'method': method,
             'columns_affected': len(numeric_cols),
@@ -106,8 +121,9 @@ class DataCleaningEngine:
         return df_clean
 
     # 4. Data Type Correction
-    def correct_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
-        df_clean = df.copy()
+    def correct_data_types(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        completeness_before = self._completeness(df)
+        df_clean = df.copy() if copy else df
 
         for col in df_clean.columns:
             # Try to convert to numeric
@@ -124,7 +140,7 @@ class DataCleaningEngine:
             except:
                 pass
 
-        score = self.calculate_quality_score(df, df_clean, 'data_type_correction')
+        score = self._score_completeness(completeness_before, df_clean, 'data_type_correction')
         self.log_action('data_type_correction', {
             'columns_processed': len(df_clean.columns),
             'quality_score': score
@@ -132,8 +148,9 @@ class DataCleaningEngine:
         return df_clean
 
     # 5. Normalization (Min-Max)
-    def normalize_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        df_clean = df.copy()
+    def normalize_data(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        completeness_before = self._completeness(df)
+        df_clean = df.copy() if copy else df
         numeric_cols = df.select_dtypes(include=[np.number]).columns
         if len(numeric_cols) == 0:
             self.log_action('normalization', {
@@ -147,7 +164,7 @@ class DataCleaningEngine:
         scaler = MinMaxScaler()
         df_clean[numeric_cols] = scaler.fit_transform(df_clean[numeric_cols])
 
-        score = self.calculate_quality_score(df, df_clean, 'normalization')
+        score = self._score_completeness(completeness_before, df_clean, 'normalization')
         self.log_action('normalization', {
             'method': 'min_max',
             'columns_affected': len(numeric_cols),
@@ -156,8 +173,9 @@ class DataCleaningEngine:
         return df_clean
 
     # 6. Standardization (Z-Score)
-    def standardize_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        df_clean = df.copy()
+    def standardize_data(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        completeness_before = self._completeness(df)
+        df_clean = df.copy() if copy else df
         numeric_cols = df.select_dtypes(include=[np.number]).columns
         if len(numeric_cols) == 0:
             self.log_action('standardization', {
@@ -171,7 +189,7 @@ class DataCleaningEngine:
         scaler = StandardScaler()
         df_clean[numeric_cols] = scaler.fit_transform(df_clean[numeric_cols])
 
-        score = self.calculate_quality_score(df, df_clean, 'standardization')
+        score = self._score_completeness(completeness_before, df_clean, 'standardization')
         self.log_action('standardization', {
             'method': 'z_score',
             'columns_affected': len(numeric_cols),
@@ -180,14 +198,15 @@ class DataCleaningEngine:
         return df_clean
 
     # 7. Noise Reduction (Moving Average)
-    def reduce_noise(self, df: pd.DataFrame, window: int = 5) -> pd.DataFrame:
-        df_clean = df.copy()
+    def reduce_noise(self, df: pd.DataFrame, window: int = 5, copy: bool = True) -> pd.DataFrame:
+        completeness_before = self._completeness(df)
+        df_clean = df.copy() if copy else df
         numeric_cols = df.select_dtypes(include=[np.number]).columns
 
         for col in numeric_cols:
             df_clean[col] = df_clean[col].rolling(window=window, center=True).mean()
 
-        score = self.calculate_quality_score(df, df_clean, 'noise_reduction')
+        score = self._score_completeness(completeness_before, df_clean, 'noise_reduction')
         self.log_action('noise_reduction', {
             'method': 'moving_average',
             'window': window,
@@ -197,8 +216,9 @@ class DataCleaningEngine:
         return df_clean
 
     # 8. Text Cleaning (NLP Preprocessing)
-    def clean_text(self, df: pd.DataFrame) -> pd.DataFrame:
-        df_clean = df.copy()
+    def clean_text(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        completeness_before = self._completeness(df)
+        df_clean = df.copy() if copy else df
         text_cols = df.select_dtypes(include=['object']).columns
 
         for col in text_cols:
@@ -207,7 +227,7 @@ class DataCleaningEngine:
             df_clean[col] = df_clean[col].str.replace(r'[^\w\s]', '', regex=True)
             df_clean[col] = df_clean[col].str.strip()
 
-        score = self.calculate_quality_score(df, df_clean, 'text_cleaning')
+        score = self._score_completeness(completeness_before, df_clean, 'text_cleaning')
         self.log_action('text_cleaning', {
             'columns_affected': len(text_cols),
             'quality_score': score
@@ -285,20 +305,20 @@ class DataCleaningEngine:
 
         df_clean = df.copy()
 
-        # Run all algorithms in sequence
-        df_clean = self.remove_duplicates(df_clean)
-        df_clean = self.impute_missing_values(df_clean, config.get('impute_strategy', 'auto'))
-        df_clean = self.detect_outliers(df_clean, config.get('outlier_method', 'iqr'))
-        df_clean = self.correct_data_types(df_clean)
+        # Run all algorithms in sequence, in place on the copy
+        df_clean = self.remove_duplicates(df_clean, copy=False)
+        df_clean = self.impute_missing_values(df_clean, config.get('impute_strategy', 'auto'), copy=False)
+        df_clean = self.detect_outliers(df_clean, config.get('outlier_method', 'iqr'), copy=False)
+        df_clean = self.correct_data_types(df_clean, copy=False)
 
         if config.get('normalize', False):
-            df_clean = self.normalize_data(df_clean)
+            df_clean = self.normalize_data(df_clean, copy=False)
         if config.get('standardize', False):
-            df_clean = self.standardize_data(df_clean)
+            df_clean = self.standardize_data(df_clean, copy=False)
         if config.get('reduce_noise', False):
-            df_clean = self.reduce_noise(df_clean)
+            df_clean = self.reduce_noise(df_clean, copy=False)
         if config.get('clean_text', False):
-            df_clean = self.clean_text(df_clean)
+            df_clean = self.clean_text(df_clean, copy=False)
 
         if config.get('rules'):
             df_clean = self.validate_rules(df_clean, config['rules'])
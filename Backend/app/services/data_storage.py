@@ -0,0 +1,116 @@
+import io
+import json
+import logging
+from typing import Any, BinaryIO, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except Exception:  # pragma: no cover - optional dependency
+    pa = None
+    pacsv = None
+    HAS_PYARROW = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+    HAS_ORJSON = False
+
+try:
+    import python_calamine  # noqa: F401 - enables pandas' calamine Excel engine
+    HAS_CALAMINE = True
+except Exception:  # pragma: no cover - optional dependency
+    HAS_CALAMINE = False
+
+logger = logging.getLogger(__name__)
+
+
+# pandas' default na_values; Arrow's own defaults miss "None" and "<NA>".
+_PANDAS_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+def _arrow_csv_table(source: BinaryIO, column_types: Optional[Dict[str, Any]] = None):
+    convert_options = pacsv.ConvertOptions(
+        null_values=_PANDAS_NA_VALUES,
+        strings_can_be_null=True,
+        column_types=column_types or {},
+    )
+    return pacsv.read_csv(source, convert_options=convert_options)
+
+
+def read_csv_upload(source: BinaryIO) -> pd.DataFrame:
+    """Parse an uploaded CSV with Arrow's multi-threaded reader, falling back to pandas."""
+    if HAS_PYARROW:
+        try:
+            table = _arrow_csv_table(source)
+            # pandas keeps date-like text as strings; re-read those columns untyped to match.
+            temporal = {field.name: pa.string() for field in table.schema if pa.types.is_temporal(field.type)}
+            if temporal:
+                source.seek(0)
+                table = _arrow_csv_table(source, temporal)
+            # pandas renames duplicate headers ("a", "a.1"); let it handle those files.
+            if len(set(table.column_names)) == table.num_columns:
+                return table.to_pandas(self_destruct=True)
+        except Exception as exc:
+            logger.warning(f"Arrow CSV parse failed, using pandas: {exc}")
+        source.seek(0)
+    return pd.read_csv(source)
+
+
+def read_excel_upload(source: BinaryIO) -> pd.DataFrame:
+    """Parse an uploaded workbook, using the Rust calamine engine when installed."""
+    if HAS_CALAMINE:
+        return pd.read_excel(source, engine="calamine")
+    return pd.read_excel(source)
+
+
+def read_json_upload(source: BinaryIO) -> pd.DataFrame:
+    """Parse an uploaded JSON document with orjson when installed, falling back to the stdlib."""
+    payload = source.read()
+    if HAS_ORJSON:
+        try:
+            return pd.DataFrame(orjson.loads(payload))
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity literals and >64-bit ints that json accepts.
+            pass
+    return pd.DataFrame(json.loads(payload))
+
+
+def records_to_arrow_bytes(records: List[Dict[str, Any]]) -> Optional[bytes]:
+    """Serialize JSON-safe records to Arrow IPC stream bytes, or None if unavailable."""
+    if not HAS_PYARROW or not records:
+        return None
+    try:
+        # Straight from the row dicts: no intermediate DataFrame copy of the upload.
+        table = pa.Table.from_pylist(records)
+        if any(pa.types.is_nested(field.type) for field in table.schema):
+            # Lists/dicts would come back as arrays/structs; keep them on the JSON path.
+            return None
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    except Exception as exc:
+        # Mixed-type columns can't always be typed; the JSON column still has the data.
+        logger.warning(f"Skipping Arrow snapshot: {exc}")
+        return None
+
+
+def load_raw_dataframe(raw_data) -> pd.DataFrame:
+    """Rebuild the uploaded DataFrame, preferring the Arrow snapshot over the JSON column."""
+    payload = getattr(raw_data, "data_arrow", None)
+    if payload and HAS_PYARROW:
+        try:
+            with pa.ipc.open_stream(io.BytesIO(payload)) as reader:
+                return reader.read_all().to_pandas(self_destruct=True)
+        except Exception as exc:
+            logger.warning(f"Falling back to JSON for raw data {raw_data.id}: {exc}")
+    return pd.DataFrame(raw_data.data)
@@ -0,0 +1,15 @@
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except Exception:  # pragma: no cover - optional dependency
+    njit = None
+    prange = range
+    HAS_NUMBA = False
+
+# Below this many cells the JIT compile costs more than the compiled loop saves.
+NUMBA_MIN_CELLS = 1_000_000
+
+
+def parallel_kernel(func):
+    """Compile func with numba's parallel njit, or return None when numba is unavailable."""
+    return njit(parallel=True, cache=True)(func) if HAS_NUMBA else None
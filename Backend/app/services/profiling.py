@@ -1,3 +1,11 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.jit import NUMBA_MIN_CELLS, parallel_kernel, prange
+
+
 def profile_data(df):
     profile = {}
     for col in df.columns:
@@ -6,3 +14,72 @@ def profile_data(df):
             "nulls": int(df[col].isnull().sum())
         }
     return profile
+
+
+def dtype_split(df: pd.DataFrame) -> Tuple[pd.Index, pd.Index]:
+    """Numeric and object column labels from one pass over df.dtypes, matching select_dtypes."""
+    numeric, text = [], []
+    for dtype in df.dtypes:
+        numeric.append(
+            issubclass(dtype.type, np.number)
+            or (getattr(dtype, "_is_numeric", False) and not pd.api.types.is_bool_dtype(dtype))
+        )
+        text.append(dtype == object)
+    return df.columns[numeric], df.columns[text]
+
+
+def _column_skew_loop(values: np.ndarray) -> np.ndarray:
+    # Same estimator as pandas' nanskew: NaN-skipping, bias-adjusted, 0 for constant columns.
+    n_rows, n_cols = values.shape
+    skews = np.empty(n_cols)
+    for j in prange(n_cols):
+        count = 0
+        total = 0.0
+        for i in range(n_rows):
+            value = values[i, j]
+            if not np.isnan(value):
+                count += 1
+                total += value
+        if count < 3:
+            skews[j] = np.nan
+            continue
+        mean = total / count
+        m2 = 0.0
+        m3 = 0.0
+        for i in range(n_rows):
+            value = values[i, j]
+            if not np.isnan(value):
+                delta = value - mean
+                m2 += delta * delta
+                m3 += delta * delta * delta
+        if abs(m2) < 1e-14:
+            skews[j] = 0.0
+            continue
+        if abs(m3) < 1e-14:
+            m3 = 0.0
+        skews[j] = (count * (count - 1) ** 0.5 / (count - 2)) * (m3 / m2 ** 1.5)
+    return skews
+
+
+_column_skew_kernel = parallel_kernel(_column_skew_loop)
+
+
+def mean_column_skew(numeric: pd.DataFrame) -> float:
+    """Mean of the per-column skewness of an all-numeric frame, as numeric.skew().mean() gives."""
+    if _column_skew_kernel is not None and numeric.size >= NUMBA_MIN_CELLS:
+        skews = _column_skew_kernel(np.asfortranarray(numeric.to_numpy(dtype=np.float64, na_value=np.nan)))
+        skews = skews[~np.isnan(skews)]
+        return float(skews.mean()) if skews.size else float("nan")
+    return float(numeric.skew().mean())
+
+
+# Rows sampled when estimating column skew for the cleaning config
+_SKEW_SAMPLE_ROWS = 5000
+
+
+def sampled_mean_skew(numeric: pd.DataFrame) -> float:
+    """mean_column_skew over a fixed-seed row sample of large frames."""
+    # Skew only gates the cleaning-config choice, so a sample is accurate enough.
+    if len(numeric) > _SKEW_SAMPLE_ROWS:
+        numeric = numeric.sample(n=_SKEW_SAMPLE_ROWS, random_state=0)
+    return mean_column_skew(numeric)
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway SQLite file before anything imports app.database.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
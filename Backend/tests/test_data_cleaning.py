@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.routers import analysis
+from app.services.data_cleaning import DataCleaningEngine
+
+ALL_STEPS_CONFIG = {
+    "impute_strategy": "auto",
+    "outlier_method": "iqr",
+    "normalize": True,
+    "standardize": True,
+    "reduce_noise": True,
+    "clean_text": True,
+}
+
+
+def _messy_frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "sales": rng.normal(100, 20, 40).round(2),
+        "qty": rng.integers(1, 10, 40),
+        "region": rng.choice([" North", "south ", "EAST"], 40),
+        "when": pd.date_range("2024-01-01", periods=40).astype(str),
+    })
+    df.loc[3, "sales"] = np.nan
+    df.loc[5, "sales"] = 10000.0
+    df.loc[7, "region"] = None
+    return pd.concat([df, df.iloc[:3]], ignore_index=True)
+
+
+def test_run_full_pipeline_leaves_input_unchanged():
+    df = _messy_frame()
+    before = df.copy()
+    DataCleaningEngine().run_full_pipeline(df, dict(ALL_STEPS_CONFIG))
+    pd.testing.assert_frame_equal(df, before)
+
+
+@pytest.mark.parametrize("method", [
+    "impute_missing_values", "remove_duplicates", "detect_outliers", "correct_data_types",
+    "normalize_data", "standardize_data", "reduce_noise", "clean_text",
+])
+def test_steps_copy_by_default(method):
+    df = _messy_frame()
+    before = df.copy()
+    getattr(DataCleaningEngine(), method)(df)
+    pd.testing.assert_frame_equal(df, before)
+
+
+def _copying(operation):
+    # Re-bind a copy=False step partial with copy=True.
+    if operation is analysis._identity:
+        return operation
+    return lambda df: operation.func(df, *operation.args, **{**operation.keywords, "copy": True})
+
+
+@pytest.mark.parametrize("algorithm", sorted(analysis._PIPELINE_SKELETON))
+def test_in_place_algorithm_steps_match_copying_steps(algorithm):
+    source = _messy_frame()
+    before = source.copy()
+
+    engine = DataCleaningEngine()
+    df_clean = source.copy()
+    for step in analysis._get_algorithm_steps(engine, algorithm, dict(ALL_STEPS_CONFIG)):
+        df_clean = step["operation"](df_clean)
+    pd.testing.assert_frame_equal(source, before)
+
+    # The copy=False partials must give the same result as the copying defaults.
+    engine = DataCleaningEngine()
+    expected = source.copy()
+    for step in analysis._get_algorithm_steps(engine, algorithm, dict(ALL_STEPS_CONFIG)):
+        expected = _copying(step["operation"])(expected)
+    pd.testing.assert_frame_equal(df_clean, expected)
+
@@ -0,0 +1,38 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import data_storage
+from app.services.data_storage import read_csv_upload
+
+NA_TOKENS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+def _csv_with_na_tokens() -> bytes:
+    lines = ["label,amount,note"]
+    for i, token in enumerate(NA_TOKENS):
+        lines.append(f"row{i},{token},{token}")
+        lines.append(f"ok{i},{i}.5,text{i}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@pytest.mark.skipif(not data_storage.HAS_PYARROW, reason="pyarrow not installed")
+def test_arrow_csv_nulls_match_pandas(monkeypatch):
+    payload = _csv_with_na_tokens()
+    expected = pd.read_csv(io.BytesIO(payload))
+
+    def _no_fallback(*args, **kwargs):
+        raise AssertionError("Arrow reader fell back to pandas")
+
+    monkeypatch.setattr(data_storage.pd, "read_csv", _no_fallback)
+    actual = read_csv_upload(io.BytesIO(payload))
+
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual.isna(), expected.isna())
+    np.testing.assert_allclose(actual["amount"].to_numpy(dtype=float), expected["amount"].to_numpy(dtype=float))
+    assert actual["note"].dropna().tolist() == expected["note"].dropna().tolist()
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.routers import analysis
+from app.services import profiling
+
+
+def _frame(rows=400, cols=6, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.lognormal(size=(rows, cols)), columns=[f"c{i}" for i in range(cols)])
+    df.iloc[::7, 0] = np.nan
+    df["constant"] = 3.0
+    df["short"] = np.nan
+    df.loc[:1, "short"] = [1.0, 2.0]
+    return df
+
+
+def test_skew_loop_matches_pandas():
+    df = _frame()
+    values = np.asfortranarray(df.to_numpy(dtype=np.float64))
+    np.testing.assert_allclose(profiling._column_skew_loop(values), df.skew().to_numpy(), equal_nan=True)
+
+
+def test_mean_column_skew_fallback_matches_pandas(monkeypatch):
+    df = _frame()
+    monkeypatch.setattr(profiling, "_column_skew_kernel", None)
+    assert profiling.mean_column_skew(df) == pytest.approx(float(df.skew().mean()))
+
+
+def test_mean_column_skew_numba_matches_fallback(monkeypatch):
+    pytest.importorskip("numba")
+    df = _frame()
+    expected = profiling.mean_column_skew(df)
+    monkeypatch.setattr(profiling, "NUMBA_MIN_CELLS", 0)
+    assert profiling.mean_column_skew(df) == pytest.approx(expected)
+
+
+def test_iqr_loop_matches_vectorised_fallback(monkeypatch):
+    df = _frame()
+    monkeypatch.setattr(analysis, "_iqr_outlier_kernel", None)
+    values = np.asfortranarray(df.to_numpy(dtype=np.float64))
+    assert analysis._iqr_outlier_loop(values) == analysis._count_iqr_outliers(df)
+
+
+def test_iqr_numba_matches_fallback(monkeypatch):
+    pytest.importorskip("numba")
+    df = _frame()
+    monkeypatch.setattr(analysis, "_iqr_outlier_kernel", None)
+    expected = analysis._count_iqr_outliers(df)
+    monkeypatch.undo()
+    monkeypatch.setattr(analysis, "NUMBA_MIN_CELLS", 0)
+    assert analysis._iqr_outlier_kernel is not None
+    assert analysis._count_iqr_outliers(df) == expected
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.routers import analysis
+
+LIMIT = analysis._FLOAT32_EXACT_LIMIT
+
+
+def _boundary_frame(rows, seed):
+    # Integer columns near +/-LIMIT, each with values planted on and beside its IQR fences.
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for j in range(300):
+        sign = 1 if j % 2 else -1
+        base = LIMIT - 4 * int(rng.integers(1, 64))
+        values = sign * rng.integers(base - 256, base, size=rows)
+        q1, q3 = np.quantile(values.astype(np.float64), [0.25, 0.75])
+        fence = q1 - 1.5 * (q3 - q1)
+        values[:3] = [np.floor(fence), np.ceil(fence), np.round(fence)]
+        values = np.clip(values, -LIMIT, LIMIT)
+        columns[f"c{j}"] = values.astype(np.int64)
+    return pd.DataFrame(columns)
+
+
+@pytest.mark.parametrize("rows", range(6, 12))
+def test_float32_counts_match_float64_at_limit(monkeypatch, rows):
+    monkeypatch.setattr(analysis, "_iqr_outlier_kernel", None)
+    df = _boundary_frame(rows, seed=rows)
+    assert np.abs(df.to_numpy()).max() == LIMIT
+    assert analysis._outlier_values(df).dtype == np.float32
+    assert analysis._count_iqr_outliers(df) == analysis._count_iqr_outliers(df.astype(np.float64))
+
+
+def test_float32_path_skipped_above_limit():
+    df = pd.DataFrame({"a": [0, 1, 2, LIMIT + 1]})
+    assert analysis._outlier_values(df).dtype == np.float64